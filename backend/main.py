@@ -1,5 +1,6 @@
 import os
 import time
+import atexit
 import threading
 from collections import deque
 from datetime import timedelta
@@ -14,6 +15,7 @@ from instruments import (
     load_from_cache,
     is_cache_valid
 )
+from tick_snapshot import save_snapshot, load_snapshot
 
 app = Flask(__name__)
 CORS(app)
@@ -28,8 +30,13 @@ class SegmentPriorityManager:
         # Just to initialize once
         self.kite, _ = initialize_kite()
 
-        # Central storage for all ticks
-        self.central_storage = {}
+        # Central storage for all ticks, warm-started from the last checkpoint.
+        # Restored entries carry 'stale': True until a live tick replaces them.
+        self.snapshot_file = "tick_snapshot.bin"
+        self.snapshot_interval = 5  # seconds between checkpoints
+        self.snapshot_lock = threading.RLock()  # one checkpoint writer at a time; re-entered by manage_checkpoints
+        self.central_storage = load_snapshot(self.snapshot_file)
+        print(f"Restored {len(self.central_storage)} ticks from {self.snapshot_file}.")
 
         # Dictionary tracking active websockets: {ws_id: kws_instance}
         self.connections = {}
@@ -60,6 +67,37 @@ class SegmentPriorityManager:
 
         return priority_instruments, rotation_instruments
 
+    ################################################################
+    #              TICK SNAPSHOT (WARM RESTART)
+    ################################################################
+
+    def checkpoint(self):
+        """Persist the current tick store so a restart can reload it."""
+        with self.snapshot_lock:
+            # Copy under the lock so snapshots are written in the order taken.
+            # dict.copy() is atomic under the GIL, so on_ticks can keep writing.
+            storage = self.central_storage.copy()
+            if not storage:
+                return
+            try:
+                save_snapshot(storage, self.snapshot_file)
+            except Exception as e:
+                print(f"[checkpoint] Error writing {self.snapshot_file}: {e}")
+
+    def manage_checkpoints(self):
+        """Checkpoint the tick store every `snapshot_interval` seconds until shutdown."""
+        while not shutdown_event.wait(self.snapshot_interval):
+            with self.snapshot_lock:
+                # final_checkpoint owns the last write once shutdown starts
+                if shutdown_event.is_set():
+                    break
+                self.checkpoint()
+
+    def final_checkpoint(self):
+        """Exit hook: stop the background threads, then write one last snapshot."""
+        shutdown_event.set()
+        self.checkpoint()
+
     ################################################################
     #              KITE WEBSOCKET EVENT HANDLERS
     ################################################################
@@ -78,6 +116,8 @@ class SegmentPriorityManager:
                 'instrument_token': token,
                 'last_price': last_price,
                 'net_change': round(last_price - close_price, 2),
+                'updated_at': time.time(),
+                'stale': False,
             }
 
         # Broadcast to all Socket.IO clients
@@ -174,6 +214,8 @@ class SegmentPriorityManager:
            (b) or 3000 priority if >3000, pushing overflow to rotation
         3) Setup WS #2 + #3 for the remaining rotation
         4) Launch rotation threads with automatic reconnect
+        Returns False if WebSocket #1 could not be established or subscribed;
+        no rotation thread has been started at that point, so it is safe to retry.
         """
         priority_instruments, rotation_instruments = self.segment_priority_filter(instruments)
         priority_tokens = [i['instrument_token'] for i in priority_instruments]
@@ -185,7 +227,7 @@ class SegmentPriorityManager:
 
         if not ws1:
             print("ERROR: Could not initialize WebSocket #1. Aborting streaming.")
-            return
+            return False
 
         count_priority = len(priority_tokens)
         if count_priority <= self.SYMBOLS_PER_CONNECTION:
@@ -201,8 +243,12 @@ class SegmentPriorityManager:
 
             combined_ws1_tokens = priority_tokens + leftover_tokens_for_ws1
             # Subscribe them
-            ws1.subscribe(combined_ws1_tokens)
-            ws1.set_mode(ws1.MODE_FULL, combined_ws1_tokens)
+            try:
+                ws1.subscribe(combined_ws1_tokens)
+                ws1.set_mode(ws1.MODE_FULL, combined_ws1_tokens)
+            except Exception as e:
+                print(f"ERROR: WS1 subscribe failed: {e}. Aborting streaming.")
+                return False
             print(f"WS1 subscribed to {len(priority_tokens)} priority + {len(leftover_tokens_for_ws1)} leftover (total {len(combined_ws1_tokens)}).")
 
             # If leftover tokens used, start rotation on WS1
@@ -222,8 +268,12 @@ class SegmentPriorityManager:
             overflow_priority = priority_tokens[self.SYMBOLS_PER_CONNECTION:]  # the excess
             rotation_tokens = overflow_priority + rotation_tokens  # push to rotation
 
-            ws1.subscribe(ws1_priority)
-            ws1.set_mode(ws1.MODE_FULL, ws1_priority)
+            try:
+                ws1.subscribe(ws1_priority)
+                ws1.set_mode(ws1.MODE_FULL, ws1_priority)
+            except Exception as e:
+                print(f"ERROR: WS1 subscribe failed: {e}. Aborting streaming.")
+                return False
             print(f"WS1 subscribed to 3000 priority. Overflow {len(overflow_priority)} merged into rotation.")
 
         # Now handle rotation tokens with WS2, WS3
@@ -261,6 +311,8 @@ class SegmentPriorityManager:
             )
             t3.start()
 
+        return True
+
     def _split_list_in_half(self, lst):
         half = len(lst) // 2
         return (lst[:half], lst[half:])
@@ -399,15 +451,51 @@ def get_all_ticks():
 #                     MAIN ENTRY POINT
 ################################################################
 
-if __name__ == '__main__':
+def load_instruments_and_stream(max_backoff=300):
+    """
+    Runs in a background thread. Retries the instrument load and the WS1 step
+    with exponential backoff (capped at `max_backoff` seconds) until streaming
+    starts. Meanwhile /api/ticks keeps serving the restored, stale snapshot.
+    """
     cache_file = "instruments_cache.pkl"
-    if is_cache_valid(cache_file, timedelta(hours=24)):
-        instruments = load_from_cache(cache_file)
-    else:
-        instruments = fetch_and_cache_instruments()
+    backoff = 10
+    attempt = 1
+    while not shutdown_event.is_set():
+        try:
+            if is_cache_valid(cache_file, timedelta(hours=24)):
+                instruments = load_from_cache(cache_file)
+            else:
+                instruments = fetch_and_cache_instruments()
+        except Exception as e:
+            print(f"[startup] Error loading instruments, attempt={attempt}: {e}")
+        else:
+            try:
+                if manager.start_streaming(instruments):
+                    return
+            except Exception as e:
+                # Past the WS1 step rotation threads may already be running,
+                # so calling start_streaming again would duplicate them.
+                print(f"ERROR: start_streaming failed after WS1 was set up: {e}")
+                return
+            print(f"[startup] Streaming did not start, attempt={attempt}")
+
+        print(f"[startup] Retrying in {backoff}s; serving snapshot data marked stale meanwhile.")
+        if shutdown_event.wait(backoff):
+            return
+        backoff = min(backoff * 2, max_backoff)
+        attempt += 1
+
 
+if __name__ == '__main__':
+    # Restores the last tick snapshot, so /api/ticks is complete right away
     manager = SegmentPriorityManager()
-    manager.start_streaming(instruments)
+
+    threading.Thread(target=manager.manage_checkpoints, daemon=True).start()
+    atexit.register(manager.final_checkpoint)
+
+    # Instrument download and WebSocket setup take several seconds;
+    # run them in the background so the server starts serving immediately.
+    threading.Thread(target=load_instruments_and_stream, daemon=True).start()
 
     # Turn on debug logs, but disable the reloader to avoid double-spawning
     socketio.run(app, debug=True, use_reloader=False, host='127.0.0.1', port=5000)
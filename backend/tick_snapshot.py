@@ -0,0 +1,98 @@
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+# File layout: one fixed-size header followed by `count` fixed-size records.
+#   header: magic, format version, record count, saved_at (epoch seconds)
+#   record: instrument_token, change, last_price, net_change, updated_at
+SNAPSHOT_MAGIC = b'TSNP'
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct('<4sHxxId')
+RECORD = struct.Struct('<Idddd')
+
+# Snapshots, and individual ticks inside them, older than this are not restored.
+# Long enough to bridge a holiday weekend (e.g. Thursday close to Monday open,
+# ~90h) with room to spare; short enough that a weekly contract's ticks drop
+# out within a week of its expiry.
+MAX_SNAPSHOT_AGE = 7 * 24 * 60 * 60  # seconds
+
+
+def save_snapshot(storage, snapshot_file):
+    """
+    Write every tick in `storage` to `snapshot_file`.
+    Each call writes its own temp file next to the target and swaps it in
+    with os.replace, so a crash mid-write never leaves a truncated snapshot behind.
+    """
+    entries = list(storage.values())
+    buf = bytearray(HEADER.size + RECORD.size * len(entries))
+    HEADER.pack_into(buf, 0, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(entries), time.time())
+
+    offset = HEADER.size
+    for entry in entries:
+        RECORD.pack_into(
+            buf, offset,
+            entry['instrument_token'],
+            entry['change'],
+            entry['last_price'],
+            entry['net_change'],
+            entry.get('updated_at', 0.0),
+        )
+        offset += RECORD.size
+
+    snapshot_dir, snapshot_name = os.path.split(os.path.abspath(snapshot_file))
+    fd, tmp_file = tempfile.mkstemp(dir=snapshot_dir, prefix=snapshot_name + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(buf)
+        os.replace(tmp_file, snapshot_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def load_snapshot(snapshot_file, max_age=MAX_SNAPSHOT_AGE):
+    """
+    Memory-map `snapshot_file` and rebuild the tick store from it.
+    Every restored entry is flagged `stale` until a live tick replaces it.
+    Ticks last updated more than `max_age` seconds ago are dropped.
+    Returns an empty dict if the file is missing, too old or unreadable.
+    """
+    try:
+        return _read_snapshot(snapshot_file, time.time() - max_age)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"[load_snapshot] Error reading {snapshot_file}: {e}")
+        return {}
+
+
+def _read_snapshot(snapshot_file, cutoff):
+    if not os.path.exists(snapshot_file) or os.path.getsize(snapshot_file) < HEADER.size:
+        return {}
+
+    with open(snapshot_file, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, count, saved_at = HEADER.unpack_from(mm, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                return {}
+            if saved_at < cutoff:
+                return {}
+            if len(mm) < HEADER.size + RECORD.size * count:
+                return {}
+
+            storage = {}
+            for offset in range(HEADER.size, HEADER.size + RECORD.size * count, RECORD.size):
+                # Unpack straight from the map; no copy of the record area
+                token, change, last_price, net_change, updated_at = RECORD.unpack_from(mm, offset)
+                if updated_at < cutoff:
+                    continue
+                storage[token] = {
+                    'change': change,
+                    'instrument_token': token,
+                    'last_price': last_price,
+                    'net_change': net_change,
+                    'updated_at': updated_at,
+                    'stale': True,
+                }
+            return storage